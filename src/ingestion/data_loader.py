@@ -2,9 +2,23 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
+import pyarrow as pa
+from pyarrow import csv as pa_csv
 
 sns.set_style("whitegrid")
 
+# Column types declared up front so the CSV is parsed straight into its final
+# dtypes instead of being inferred and then converted again.
+COLUMN_TYPES = {
+    'PolicyID': pa.int64(),
+    'TransactionMonth': pa.timestamp('ns'),
+    'TotalPremium': pa.float32(),
+    'TotalClaims': pa.float32(),
+    'SumInsured': pa.float32(),
+    'CustomValueEstimate': pa.float32(),
+    'PostalCode': pa.string(),
+}
+
 
 # --- 1. Data Loading Class ---
 
@@ -22,8 +36,15 @@ class DataLoader:
         """Loads the CSV file into a Pandas DataFrame."""
         print(f"Loading data from: {self.file_path}")
         try:
-            # Conceptual: Assuming the historical data is a CSV file
-            self.df = pd.read_csv(self.file_path,  sep='|')
+            # Parse the pipe-delimited file with Arrow's multithreaded reader
+            table = pa_csv.read_csv(
+                self.file_path,
+                parse_options=pa_csv.ParseOptions(delimiter='|'),
+                # pyarrow's default null tokens match pd.read_csv's ('', 'NA', 'N/A', 'nan', 'null', ...)
+                convert_options=pa_csv.ConvertOptions(column_types=COLUMN_TYPES,
+                                                      strings_can_be_null=True),
+            )
+            self.df = table.to_pandas()
             print("Data loaded successfully.")
             return self.df
         except FileNotFoundError:
@@ -36,8 +57,11 @@ class DataLoader:
     def preprocess_initial(self):
         """Performs initial type conversions required for cleaning."""
         if self.df is not None:
+            # load_data already parses the declared columns into their final types,
+            # so only convert columns that did not come through the typed reader.
             # Convert date columns to datetime objects
-            if 'TransactionMonth' in self.df.columns:
+            if 'TransactionMonth' in self.df.columns and \
+                    not pd.api.types.is_datetime64_any_dtype(self.df['TransactionMonth']):
                 # Assuming the format is simple enough for direct conversion
                 self.df['TransactionMonth'] = pd.to_datetime(self.df['TransactionMonth'])
                 print("- Converted 'TransactionMonth' to datetime.")
@@ -45,9 +69,20 @@ class DataLoader:
             # Ensure financial columns are numeric
             financial_cols = ['TotalPremium', 'TotalClaims', 'SumInsured', 'CustomValueEstimate']
             for col in financial_cols:
-                if col in self.df.columns:
+                if col in self.df.columns and not pd.api.types.is_numeric_dtype(self.df[col]):
                     # Coerce non-numeric values to NaN
                     self.df[col] = pd.to_numeric(self.df[col], errors='coerce')
+                if col in self.df.columns and self.df[col].dtype != np.float32:
+                    # Single precision is plenty for currency amounts and halves memory
+                    self.df[col] = self.df[col].astype('float32')
+
+            # Store repeated labels as categoricals so groupbys work on integer codes
+            categorical_cols = ['Province', 'PostalCode', 'Gender', 'Bodytype', 'MakeModel',
+                                'CoverCategory', 'LegalType']
+            for col in categorical_cols:
+                if col in self.df.columns:
+                    self.df[col] = self.df[col].astype('category')
+            print("- Downcast financial columns to float32 and labels to category.")
 
             return self.df
         return None
\ No newline at end of file
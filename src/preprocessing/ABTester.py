@@ -1,7 +1,40 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
 import pandas as pd
 import numpy as np
 from scipy import stats
 from src.reports.business_reporter import BusinessReporter
+from src.preprocessing.features import engineer_risk_features
+
+
+def welch_from_moments(mean_a, var_a, n_a, mean_b, var_b, n_b):
+    """
+    Welch's t-test from per-sample mean, variance (ddof=1) and size.
+    Works elementwise on NumPy arrays, so many comparisons run in one call.
+    Returns (t, df, p).
+    """
+    se_a = var_a / n_a
+    se_b = var_b / n_b
+    t = (mean_a - mean_b) / np.sqrt(se_a + se_b)
+    # Welch-Satterthwaite degrees of freedom
+    df = (se_a + se_b) ** 2 / (se_a ** 2 / (n_a - 1) + se_b ** 2 / (n_b - 1))
+    p = 2 * stats.t.sf(np.abs(t), df)
+    return t, df, p
+
+
+def chi2_from_counts(counts):
+    """Pearson chi-square test of independence on a 2D array of counts. Returns (chi2, dof, p)."""
+    expected = np.outer(counts.sum(axis=1), counts.sum(axis=0)) / counts.sum()
+    chi2 = float(((counts - expected) ** 2 / expected).sum())
+    dof = (counts.shape[0] - 1) * (counts.shape[1] - 1)
+    # A table with a single row or column carries no evidence against independence
+    # (chi2_contingency reports p = 1.0 there; chi2.sf(0, 0) would be NaN)
+    p = float(stats.chi2.sf(chi2, dof)) if dof > 0 else 1.0
+    return chi2, dof, p
+
+
 class ABTester:
     """
     Executes hypothesis tests on insurance KPIs:
@@ -11,27 +44,70 @@ class ABTester:
     Provides multi-group and A/B pairwise tests with basic balance checks.
     """
 
-    def __init__(self, df):
-        self.df = df.copy()
-        # Derived labels
-        self.df['HadClaim'] = (self.df['TotalClaims'] > 0).astype(int)
+    # Columns the tests read; everything else in the input frame is left behind
+    DEFAULT_COLUMNS = ('TotalClaims', 'TotalPremium', 'ClaimCount', 'Province', 'PostalCode', 'ZipCode',
+                       'Gender', 'CoverCategory', 'Bodytype', 'LegalType', 'CustomValueEstimate', 'SumInsured')
+
+    def __init__(self, df, cols=DEFAULT_COLUMNS):
+        # Column selection already returns a new frame, so no extra defensive copy
+        self.df = df.loc[:, [c for c in cols if c in df.columns]]
+        # Derived labels (HadClaim, Margin, severity conditional on ClaimCount > 0)
+        engineer_risk_features(self.df, claim_flag='HadClaim')
         # If ClaimCount not present, proxy with HadClaim
         if 'ClaimCount' not in self.df.columns:
             self.df['ClaimCount'] = self.df['HadClaim']
-        # Severity conditional on ClaimCount > 0
-        self.df['AvgClaimSeverity'] = np.where(self.df['ClaimCount'] > 0,
-                                               self.df['TotalClaims'] / self.df['ClaimCount'], np.nan)
-        self.df['Margin'] = self.df['TotalPremium'] - self.df['TotalClaims']
+        # Per group column: (codes, uniques, order that sorts rows by code)
+        self._cache = {}
+        # run_all calls tests concurrently; the lock makes them share one factorization
+        self._cache_lock = threading.Lock()
+
+    def _require_columns(self, *cols):
+        """Fails with a clear message when a test asks for a column the slim frame does not keep."""
+        missing = [c for c in cols if c not in self.df.columns]
+        if missing:
+            raise ValueError(f"Column(s) {missing} not available in ABTester; "
+                             f"pass them through the cols= argument when constructing it.")
+
+    def _grouped(self, group_col):
+        """Factorizes and sorts a group column once; every test on that column reuses the result."""
+        with self._cache_lock:
+            if group_col not in self._cache:
+                codes, uniques = pd.factorize(self.df[group_col], sort=True)
+                order = np.argsort(codes, kind='stable')
+                self._cache[group_col] = (codes, uniques, order)
+            return self._cache[group_col]
+
+    def _split_by_group(self, group_col, metric_col):
+        """Returns the non-missing metric values of each group as views of one sorted array."""
+        codes, _, order = self._grouped(group_col)
+        codes = codes[order]
+        vals = self.df[metric_col].to_numpy(dtype=np.float64)[order]
+        m = (codes >= 0) & ~np.isnan(vals)
+        codes, vals = codes[m], vals[m]
+        # Rows are already sorted by group code, so split at the group boundaries
+        sizes = np.bincount(codes)
+        groups = np.split(vals, np.cumsum(sizes)[:-1])
+        return [g for g in groups if g.size > 0]
 
     # ---------- Multi-group tests ----------
     def chi2_frequency_by_group(self, group_col):
-        ct = pd.crosstab(self.df[group_col], self.df['HadClaim'])
-        chi2, p, dof, _ = stats.chi2_contingency(ct)
+        self._require_columns(group_col)
+        codes, uniques, _ = self._grouped(group_col)
+        m = codes >= 0
+        k = len(uniques)
+        # Group x HadClaim counts from one bincount over (code, flag) pairs
+        counts = np.bincount(codes[m] * 2 + self.df['HadClaim'].to_numpy()[m], minlength=2 * k).reshape(k, 2)
+        ct = pd.DataFrame(counts, index=pd.Index(uniques, name=group_col),
+                          columns=pd.Index([0, 1], name='HadClaim'))
+        ct = ct.loc[:, ct.sum() > 0]
+        # Pearson chi-square computed directly on the counts (no scipy per-table overhead)
+        chi2, dof, p = chi2_from_counts(ct.to_numpy())
         return {"group": group_col, "test": "chi2_frequency", "chi2": chi2, "dof": dof, "p_value": p,
                 "table": ct}
 
     def anova_severity_by_group(self, group_col):
-        groups = [g.dropna().values for _, g in self.df.groupby(group_col)['AvgClaimSeverity']]
+        self._require_columns(group_col)
+        groups = self._split_by_group(group_col, 'AvgClaimSeverity')
         # Fallback to Kruskal if any group small or non-normal suspected
         if any(len(g) < 20 for g in groups):
             stat, p = stats.kruskal(*groups)
@@ -40,7 +116,8 @@ class ABTester:
         return {"group": group_col, "test": "anova_severity", "F": f, "p_value": p}
 
     def anova_margin_by_group(self, group_col):
-        groups = [g.values for _, g in self.df.groupby(group_col)['Margin']]
+        self._require_columns(group_col)
+        groups = self._split_by_group(group_col, 'Margin')
         if any(len(g) < 20 for g in groups):
             stat, p = stats.kruskal(*groups)
             return {"group": group_col, "test": "kruskal_margin", "stat": stat, "p_value": p}
@@ -49,23 +126,53 @@ class ABTester:
 
     # ---------- Pairwise A/B tests ----------
     def ttest_metric_between_groups(self, group_col, metric_col, a, b):
-        a_vals = self.df[self.df[group_col] == a][metric_col].dropna()
-        b_vals = self.df[self.df[group_col] == b][metric_col].dropna()
+        self._require_columns(group_col, metric_col)
+        # Filter only the metric column rather than the whole frame
+        metric = self.df[metric_col]
+        a_vals = metric[self.df[group_col] == a].dropna()
+        b_vals = metric[self.df[group_col] == b].dropna()
+        x = a_vals.to_numpy(dtype=np.float64)
+        y = b_vals.to_numpy(dtype=np.float64)
         # Welch’s t-test by default (unequal variances)
-        t, p = stats.ttest_ind(a_vals, b_vals, equal_var=False)
+        t, _, p = welch_from_moments(x.mean(), x.var(ddof=1), x.size, y.mean(), y.var(ddof=1), y.size)
         return {"group": group_col, "metric": metric_col, "A": a, "B": b,
-                "mean_A": float(a_vals.mean()), "mean_B": float(b_vals.mean()),
+                "mean_A": float(x.mean()), "mean_B": float(y.mean()),
                 "t_stat": float(t), "p_value": float(p)}
 
+    def pairwise_ttests_by_group(self, group_col, metric_col):
+        """Welch's t-test of metric_col for every pair of groups, from per-group moments."""
+        self._require_columns(group_col, metric_col)
+        codes, uniques, _ = self._grouped(group_col)
+        vals = self.df[metric_col].to_numpy(dtype=np.float64)
+        m = (codes >= 0) & ~np.isnan(vals)
+        codes, vals = codes[m], vals[m]
+        k = len(uniques)
+        n = np.bincount(codes, minlength=k).astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.bincount(codes, weights=vals, minlength=k) / n
+            var = np.bincount(codes, weights=(vals - mean[codes]) ** 2, minlength=k) / (n - 1)
+            i, j = np.triu_indices(k, 1)
+            t, df, p = welch_from_moments(mean[i], var[i], n[i], mean[j], var[j], n[j])
+        table = pd.DataFrame({"A": uniques.take(i), "B": uniques.take(j),
+                              "mean_A": mean[i], "mean_B": mean[j],
+                              "t_stat": t, "df": df, "p_value": p})
+        return {"group": group_col, "metric": metric_col, "test": "welch_pairwise", "table": table}
+
     def ztest_proportions(self, group_col, a, b):
-        a_succ = int(self.df[self.df[group_col] == a]['HadClaim'].sum())
-        a_total = int(self.df[self.df[group_col] == a]['HadClaim'].count())
-        b_succ = int(self.df[self.df[group_col] == b]['HadClaim'].sum())
-        b_total = int(self.df[self.df[group_col] == b]['HadClaim'].count())
+        self._require_columns(group_col)
+        # One mask per arm, reused for both the success count and the total
+        had_claim = self.df['HadClaim'].to_numpy()
+        mask_a = (self.df[group_col] == a).to_numpy()
+        mask_b = (self.df[group_col] == b).to_numpy()
+        a_succ = int(had_claim[mask_a].sum())
+        a_total = int(mask_a.sum())
+        b_succ = int(had_claim[mask_b].sum())
+        b_total = int(mask_b.sum())
         p_pool = (a_succ + b_succ) / (a_total + b_total)
         se = np.sqrt(p_pool * (1 - p_pool) * (1/a_total + 1/b_total))
         z = ((a_succ/a_total) - (b_succ/b_total)) / se
-        p = 2 * (1 - stats.norm.cdf(abs(z)))
+        # Survival function keeps precision in the tail, where 1 - cdf rounds to 0
+        p = 2 * stats.norm.sf(abs(z))
         return {"group": group_col, "metric": "HadClaim", "A": a, "B": b,
                 "rate_A": a_succ/a_total, "rate_B": b_succ/b_total,
                 "z_score": float(z), "p_value": float(p)}
@@ -75,41 +182,65 @@ class ABTester:
         covariates_num = covariates_num or ['CustomValueEstimate', 'SumInsured', 'TotalPremium']
         covariates_cat = covariates_cat or ['CoverCategory', 'Bodytype', 'LegalType']
         report = {"numeric": {}, "categorical": {}}
-        a_df = self.df[self.df[group_col] == a]
-        b_df = self.df[self.df[group_col] == b]
-        for col in covariates_num:
-            x = a_df[col].dropna(); y = b_df[col].dropna()
-            if len(x) > 5 and len(y) > 5:
-                t, p = stats.ttest_ind(x, y, equal_var=False)
-                report["numeric"][col] = {"mean_A": float(x.mean()), "mean_B": float(y.mean()),
-                                          "t_stat": float(t), "p_value": float(p)}
+        self._require_columns(group_col, *covariates_num, *covariates_cat)
+        # Filter only the covariate columns rather than the whole frame
+        cols = list(dict.fromkeys(covariates_num + covariates_cat))
+        a_df = self.df.loc[self.df[group_col] == a, cols]
+        b_df = self.df.loc[self.df[group_col] == b, cols]
+        # Welch's t-test for all numeric covariates at once, column-wise over an n x k matrix
+        A = a_df[covariates_num].to_numpy(dtype=np.float64)
+        B = b_df[covariates_num].to_numpy(dtype=np.float64)
+        n_a = (~np.isnan(A)).sum(axis=0)
+        n_b = (~np.isnan(B)).sum(axis=0)
+        ok = (n_a > 5) & (n_b > 5)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_a = np.nansum(A, axis=0) / n_a
+            mean_b = np.nansum(B, axis=0) / n_b
+            var_a = np.nansum((A - mean_a) ** 2, axis=0) / (n_a - 1)
+            var_b = np.nansum((B - mean_b) ** 2, axis=0) / (n_b - 1)
+            t, _, p = welch_from_moments(mean_a, var_a, n_a, mean_b, var_b, n_b)
+        for i in np.flatnonzero(ok):
+            report["numeric"][covariates_num[i]] = {"mean_A": float(mean_a[i]), "mean_B": float(mean_b[i]),
+                                                    "t_stat": float(t[i]), "p_value": float(p[i])}
+        # Chi-square on the 2 x k table of category counts in A vs B
+        rows_a = len(a_df)
         for col in covariates_cat:
-            ct = pd.crosstab(a_df[col], b_df[col])
-            if ct.size > 0:
-                chi2, p, _, _ = stats.chi2_contingency(ct)
-                report["categorical"][col] = {"chi2": float(chi2), "p_value": float(p)}
+            codes, uniques = pd.factorize(pd.concat([a_df[col], b_df[col]], ignore_index=True))
+            codes_a, codes_b = codes[:rows_a], codes[rows_a:]
+            k = len(uniques)
+            counts = np.vstack([np.bincount(codes_a[codes_a >= 0], minlength=k),
+                                np.bincount(codes_b[codes_b >= 0], minlength=k)])
+            if k > 1 and counts.sum(axis=1).all():
+                chi2, _, p = chi2_from_counts(counts)
+                report["categorical"][col] = {"chi2": chi2, "p_value": p}
         return report
 
     # ---------- Execution helpers ----------
-    def run_all(self):
-        results = {}
+    def run_all(self, max_workers=None):
+        # The tests only read self.df and spend their time in pandas/NumPy/SciPy
+        # kernels, so they are run concurrently on a thread pool sharing one frame.
+        jobs = {}
 
         # H0-1: Provinces (risk differences)
-        results["province_freq"] = self.chi2_frequency_by_group("Province")
-        results["province_severity"] = self.anova_severity_by_group("Province")
+        jobs["province_freq"] = partial(self.chi2_frequency_by_group, "Province")
+        jobs["province_severity"] = partial(self.anova_severity_by_group, "Province")
 
         # H0-2: Zip codes (risk differences)
         zip_col = "PostalCode" if "PostalCode" in self.df.columns else "ZipCode"
-        results["zip_freq"] = self.chi2_frequency_by_group(zip_col)
-        results["zip_severity"] = self.anova_severity_by_group(zip_col)
+        jobs["zip_freq"] = partial(self.chi2_frequency_by_group, zip_col)
+        jobs["zip_severity"] = partial(self.anova_severity_by_group, zip_col)
 
         # H0-3: Zip margins (profit differences)
-        results["zip_margin"] = self.anova_margin_by_group(zip_col)
+        jobs["zip_margin"] = partial(self.anova_margin_by_group, zip_col)
 
         # H0-4: Gender (risk differences)
         # Frequency (proportion test) and Severity (Welch t-test)
-        #results["gender_freq"] = self.ztest_proportions("Gender", "F", "M")
-        results["gender_severity"] = self.ttest_metric_between_groups("Gender", "AvgClaimSeverity", "F", "M")
+        #jobs["gender_freq"] = partial(self.ztest_proportions, "Gender", "F", "M")
+        jobs["gender_severity"] = partial(self.ttest_metric_between_groups, "Gender", "AvgClaimSeverity", "F", "M")
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {name: pool.submit(fn) for name, fn in jobs.items()}
+            results = {name: future.result() for name, future in futures.items()}
 
         return results
 
@@ -1,3 +1,9 @@
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
 # Import the necessary classes from their respective modules
 from src.ingestion.data_loader import DataLoader
 from data_cleaner import DataCleaner
@@ -6,18 +12,104 @@ from data_visualizer import DataVisualizer
 from src.reports.business_reporter import BusinessReporter
 from ABTester import ABTester  # Renamed import to lowercase for consistency
 
+# Part of the cleaned checkpoint's file name. Bump it whenever DataCleaner changes
+# what it produces, so checkpoints written by older code are no longer picked up.
+CLEAN_CACHE_VERSION = 1
+
 
 class AnalysisPipeline:
     """
     Orchestrates the entire data process: Load -> Clean -> EDA -> Visualize -> Test.
     """
 
-    def __init__(self, file_path):
+    def __init__(self, file_path, cache_dir=None):
         self.file_path = file_path
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else self._default_cache_dir(file_path)
         self.df = None
         self.visualizer = None
         self.data_explorer = None
 
+    @staticmethod
+    def _default_cache_dir(file_path):
+        """
+        Feather checkpoints for data/raw/<file> go to data/interim/ so the raw-data folder
+        is left alone; for any other layout they are kept next to the data file.
+        """
+        data_dir = Path(file_path).resolve().parent
+        if data_dir.name == 'raw':
+            return data_dir.parent / 'interim'
+        return data_dir
+
+    def _cache_path(self, suffix):
+        """Feather checkpoint for the raw data file, stored in the cache directory."""
+        return self.cache_dir / (Path(self.file_path).stem + suffix)
+
+    def _write_cache(self, df, cache_path):
+        """Writes a checkpoint; the cache is optional, so a failed write never stops the pipeline."""
+        tmp_path = None
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file and move it into place, so an interrupted write
+            # never leaves a truncated checkpoint behind under the final name
+            fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, prefix=cache_path.name + '.', suffix='.tmp.feather')
+            os.close(fd)
+            df.to_feather(tmp_path, compression='zstd')
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"Warning: could not write cache {cache_path}: {e}")
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _read_cache(self, cache_path):
+        """Reads a checkpoint, or returns None if it cannot be read so the caller rebuilds it."""
+        try:
+            return pd.read_feather(cache_path)
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not read cache {cache_path}, rebuilding it: {e}")
+            return None
+
+    def _is_cache_fresh(self, cache_path):
+        """A checkpoint is only reused if it is newer than the raw data file."""
+        raw_path = Path(self.file_path)
+        return (cache_path.exists() and raw_path.exists()
+                and cache_path.stat().st_mtime >= raw_path.stat().st_mtime)
+
+    def _load_clean_data(self):
+        """
+        Loads and cleans the raw data file, reusing the Feather checkpoints of a previous
+        run while they are newer than the raw file. Returns None if loading fails.
+        """
+        raw_cache = self._cache_path('.feather')
+        clean_cache = self._cache_path(f'.clean.v{CLEAN_CACHE_VERSION}.feather')
+
+        if self._is_cache_fresh(clean_cache):
+            # Typed, cleaned data from a previous run: skip loading and cleaning
+            print(f"Loading cleaned data from cache: {clean_cache}")
+            df = self._read_cache(clean_cache)
+            if df is not None:
+                return df
+
+        # 1. DATA LOADING PHASE
+        df = None
+        if self._is_cache_fresh(raw_cache):
+            print(f"Loading data from cache: {raw_cache}")
+            df = self._read_cache(raw_cache)
+        if df is None:
+            data_loader = DataLoader(self.file_path)
+            data_loader.load_data()
+            df = data_loader.preprocess_initial()
+
+            if df is None:
+                return None
+            self._write_cache(df, raw_cache)
+
+        # 2. DATA CLEANING PHASE
+        data_cleaner = DataCleaner(df)
+        # Feather needs a default index; cleaning drops rows
+        df = data_cleaner.get_cleaned_data().reset_index(drop=True)
+        self._write_cache(df, clean_cache)
+        return df
+
     def _interpret_ab_results(self, results, alpha=0.05):
         """Interprets and prints the statistical outcomes in business terms."""
         print("\n--- A/B Hypothesis Test Interpretations ---")
@@ -66,19 +158,11 @@ class AnalysisPipeline:
         print("  ALPHA CARE INSURANCE ANALYTICS PIPELINE INITIATED")
         print("======================================================")
 
-        # 1. DATA LOADING PHASE
-        data_loader = DataLoader(self.file_path)
-        raw_df = data_loader.load_data()
-        self.df = data_loader.preprocess_initial()
-
+        self.df = self._load_clean_data()
         if self.df is None:
             print("Pipeline aborted due to data loading error.")
             return
 
-        # 2. DATA CLEANING PHASE
-        data_cleaner = DataCleaner(self.df)
-        self.df = data_cleaner.get_cleaned_data()
-
         # 3. EDA & FEATURE ENGINEERING PHASE
         self.data_explorer = DataEDA(self.df)
 
@@ -2,6 +2,25 @@
 import pandas as pd
 import numpy as np
 
+
+def _normalize_labels(series, case):
+    """
+    Applies str.<case>() and str.strip() to a label column and returns it as a categorical.
+    For categorical input only the distinct labels are normalized and the row codes remapped.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        labels = getattr(series.cat.categories.astype(str).str, case)().str.strip()
+        # Labels that collapse to the same text after normalization share one new code
+        label_codes, uniques = pd.factorize(labels)
+        codes = series.cat.codes.to_numpy()
+        new_codes = np.full(codes.shape, -1, dtype=np.int64)
+        valid = codes >= 0
+        new_codes[valid] = label_codes[codes[valid]]
+        return pd.Series(pd.Categorical.from_codes(new_codes, uniques), index=series.index, name=series.name)
+    # Arrow-backed strings run .str methods as vectorized kernels
+    return getattr(series.astype('string[pyarrow]').str, case)().str.strip().astype('category')
+
+
 class DataCleaner:
     """
     Handles data quality issues: missing values, incorrect entries,
@@ -9,7 +28,8 @@ class DataCleaner:
     """
 
     def __init__(self, df):
-        self.df = df.copy()  # Work on a copy
+        # Shallow copy: every cleaning step replaces whole columns, never edits them in place
+        self.df = df.copy(deep=False)
 
     def handle_missing_values(self):
         """Imputes or removes missing values based on column type and importance."""
@@ -18,30 +38,34 @@ class DataCleaner:
 
         # Strategy 1: Impute categorical/geographic features with 'Unknown'
         categorical_impute_cols = ['Province', 'PostalCode', 'MaritalStatus', 'Gender', 'LegalType']
-        for col in categorical_impute_cols:
-            if col in self.df.columns:
-                self.df[col] = self.df[col].fillna('UNKNOWN')
-        print(f"- Imputed categorical data in {len(categorical_impute_cols)} columns with 'UNKNOWN'.")
 
         # Strategy 2: Impute numerical features (e.g., car specs) with median/mean or 0
+        # It's safer to assume a missing engine spec means a default/low value or 0
         numerical_zero_impute_cols = ['Kilowatts', 'Cylinders', 'Cubiccapacity']
-        for col in numerical_zero_impute_cols:
-            if col in self.df.columns:
-                # It's safer to assume a missing engine spec means a default/low value or 0
-                self.df[col] = self.df[col].fillna(0)
-        print(f"- Imputed car specification data with 0.")
 
         # Strategy 3: Critical financial variables (TotalPremium, TotalClaims, SumInsured)
         # We must ensure these are not missing. A missing premium/claim is critical.
         # If total premium is NaN, we fill it with 0 assuming no payment/policy validity.
         financial_cols = ['TotalPremium', 'TotalClaims', 'SumInsured']
-        for col in financial_cols:
-            if col in self.df.columns:
-                self.df[col] = self.df[col].fillna(0)
+
+        # Strategies 1-3 are applied together in a single fillna call
+        fill_map = {col: 'UNKNOWN' for col in categorical_impute_cols}
+        fill_map.update({col: 0 for col in numerical_zero_impute_cols + financial_cols})
+        fill_map = {col: value for col, value in fill_map.items() if col in self.df.columns}
+
+        for col, value in fill_map.items():
+            # Categorical columns only accept fill values that are already categories
+            if isinstance(self.df[col].dtype, pd.CategoricalDtype) and \
+                    value not in self.df[col].cat.categories:
+                self.df[col] = self.df[col].cat.add_categories(value)
+
+        self.df = self.df.fillna(fill_map)
+        print(f"- Imputed categorical data in {len(categorical_impute_cols)} columns with 'UNKNOWN'.")
+        print(f"- Imputed car specification data with 0.")
 
         # Strategy 4: Drop rows if core identifiers are missing (e.g., PolicyID)
         if 'PolicyID' in self.df.columns:
-            self.df.dropna(subset=['PolicyID'], inplace=True)
+            self.df = self.df.loc[self.df['PolicyID'].notna()]
             print("- Dropped rows with missing PolicyID.")
 
         return self.df
@@ -56,25 +80,25 @@ class DataCleaner:
             return self.df
 
         # Filter to non-zero values for cleaner outlier detection on severity
-        data = self.df[self.df[column] > 0][column]
+        values = self.df[column].to_numpy()
+        data = values[values > 0]
 
-        if data.empty:
+        if data.size == 0:
             print(f"No non-zero values in {column}. Skipping outlier capping.")
             return self.df
 
         if method == 'IQR':
-            Q1 = data.quantile(0.25)
-            Q3 = data.quantile(0.75)
+            # Both quartiles from a single quantile call
+            Q1, Q3 = np.quantile(data, [0.25, 0.75])
             IQR = Q3 - Q1
             upper_bound = Q3 + threshold * IQR
 
             # Cap the values
-            original_count = (self.df[column] > upper_bound).sum()
-            self.df[column] = np.where(
-                self.df[column] > upper_bound,
-                upper_bound,
-                self.df[column]
-            )
+            over = values > upper_bound
+            original_count = int(over.sum())
+            capped = values.copy()
+            capped[over] = upper_bound
+            self.df[column] = capped
             print(f"- Capped {original_count} outliers in {column} above {upper_bound:.2f} using IQR method.")
 
         return self.df
@@ -86,13 +110,13 @@ class DataCleaner:
 
         # Clean Gender column (if necessary, assuming values like M/m, F/f)
         if 'Gender' in self.df.columns:
-            self.df['Gender'] = self.df['Gender'].str.upper().str.strip()
+            self.df['Gender'] = _normalize_labels(self.df['Gender'], 'upper')
             # Conceptual: Map non-standard entries if required (e.g., 'U' to 'UNKNOWN')
 
         # Clean MakeModel and Bodytype (standardize text/remove noise)
         for col in ['MakeModel', 'Bodytype']:
             if col in self.df.columns:
-                self.df[col] = self.df[col].str.lower().str.strip()
+                self.df[col] = _normalize_labels(self.df[col], 'lower')
 
         return self.df
 
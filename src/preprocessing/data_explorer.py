@@ -1,30 +1,39 @@
 import numpy as np
 import pandas as pd
+from src.preprocessing.features import engineer_risk_features
+
+
 class DataEDA:
     """
     (This class remains largely the same, but now takes the cleaned data.)
     """
 
-    def __init__(self, df):
+    def __init__(self, df, verbose=False):
         self.df = df
-        self.df_clean = df.copy()
+        self.verbose = verbose
+        # Shallow copy: feature engineering only adds columns, so the input frame is untouched
+        self.df_clean = df.copy(deep=False)
         self._feature_engineer_risk_metrics()
 
     def _feature_engineer_risk_metrics(self):
         """Calculates essential risk metrics like Loss Ratio and Claim Status."""
         if self.df_clean is not None:
-            # Loss Ratio: TotalClaims / TotalPremium (handling division by zero)
-            self.df_clean['LossRatio'] = np.where(
-                self.df_clean['TotalPremium'] > 0,
-                self.df_clean['TotalClaims'] / self.df_clean['TotalPremium'],
-                0
-            )
-            # Claim Status
-            self.df_clean['HasClaim'] = np.where(self.df_clean['TotalClaims'] > 0, 1, 0)
-            print("\n- Engineered 'LossRatio' and 'HasClaim' features.")
+            engineer_risk_features(self.df_clean, claim_flag='HasClaim')
+            print("\n- Engineered 'LossRatio', 'HasClaim', 'Margin' and 'AvgClaimSeverity' features.")
 
     # ... (rest of DataEDA methods remain the same) ...
     def summarize_data_quality(self):
+        """
+        Prints a light summary of the financial columns (no quantiles) when the
+        explorer was created with verbose=True; use full_report() for the complete one.
+        """
+        if not self.verbose:
+            return
+        print("\n--- Summary Statistics for Financials ---")
+        financial_cols = ['TotalPremium', 'TotalClaims', 'SumInsured', 'CustomValueEstimate', 'LossRatio']
+        print(self.df_clean[financial_cols].agg(['count', 'mean', 'std', 'min', 'max']).T)
+
+    def full_report(self):
         """Checks data structure, missing values, and descriptive statistics."""
         print("\n--- Data Structure (df.info()) ---")
         self.df_clean.info()
@@ -51,14 +60,17 @@ class DataEDA:
         for a specified categorical column (e.g., Province, Gender).
         """
         print(f"\n--- Risk Profile by {group_col} ---")
-        risk_profile = self.df_clean.groupby(group_col)[['TotalClaims', 'TotalPremium']].sum()
+        # Sums, policy counts and claim counts from a single groupby pass;
+        # HasClaim is 0/1, so its sum is the number of claims in the group.
+        risk_profile = self.df_clean.groupby(group_col, observed=True).agg(
+            TotalClaims=('TotalClaims', 'sum'),
+            TotalPremium=('TotalPremium', 'sum'),
+            PolicyCount=('TotalClaims', 'size'),
+            ClaimCount=('HasClaim', 'sum'),
+        )
         risk_profile['LossRatio'] = risk_profile['TotalClaims'] / risk_profile['TotalPremium']
 
         # Calculate Claim Frequency (Number of claims / Total policies)
-        policy_counts = self.df_clean.groupby(group_col).size().rename('PolicyCount')
-        claim_counts = self.df_clean[self.df_clean['HasClaim'] == 1].groupby(group_col).size().rename('ClaimCount')
-
-        risk_profile = risk_profile.join(policy_counts).join(claim_counts.fillna(0))
         risk_profile['ClaimFrequency'] = risk_profile['ClaimCount'] / risk_profile['PolicyCount']
 
         return risk_profile.sort_values(by='LossRatio', ascending=False)
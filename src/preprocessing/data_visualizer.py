@@ -1 +1,36 @@
-x
\ No newline at end of file
+import numpy as np
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+sns.set_style("whitegrid")
+
+
+class DataVisualizer:
+    """
+    Produces the key plots for the cleaned, feature-engineered policy data.
+    """
+
+    def __init__(self, df):
+        self.df = df
+
+    def plot_premium_vs_value(self):
+        """
+        Plots TotalPremium against CustomValueEstimate as a 2D density (hex-bin),
+        excluding the top 1% of each variable.
+        """
+        print("\n--- Plotting Premium vs. Vehicle Value ---")
+        values = self.df[['CustomValueEstimate', 'TotalPremium']].to_numpy(dtype=np.float64)
+        # Both 99th percentiles from one call; NaN values are ignored as in Series.quantile
+        value_max, premium_max = np.nanquantile(values, 0.99, axis=0)
+        filtered = values[(values[:, 0] < value_max) & (values[:, 1] < premium_max)]
+
+        # Binning on a fixed grid costs O(grid) to draw instead of one marker per policy
+        fig, ax = plt.subplots(figsize=(10, 7))
+        hb = ax.hexbin(filtered[:, 0], filtered[:, 1],
+                       gridsize=80, bins='log', mincnt=1, cmap='viridis')
+        fig.colorbar(hb, ax=ax, label='Policies (log scale)')
+        ax.set_title('Total Premium vs. Custom Value Estimate (99th percentile)')
+        ax.set_xlabel('Custom Value Estimate')
+        ax.set_ylabel('Total Premium')
+        plt.tight_layout()
+        plt.show()
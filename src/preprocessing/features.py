@@ -0,0 +1,21 @@
+import numpy as np
+
+
+def engineer_risk_features(df, claim_flag='HasClaim'):
+    """
+    Adds the derived risk columns (0/1 claim flag named claim_flag, Margin, LossRatio,
+    AvgClaimSeverity) in place, reading TotalClaims/TotalPremium once as NumPy arrays.
+    """
+    tp = df['TotalPremium'].to_numpy()
+    tc = df['TotalClaims'].to_numpy()
+    dtype = np.result_type(tp, tc, np.float32)
+    has_claim = tc > 0
+    df[claim_flag] = has_claim.view(np.int8)
+    df['Margin'] = tp - tc
+    # Loss Ratio: TotalClaims / TotalPremium (0 where there is no premium)
+    df['LossRatio'] = np.divide(tc, tp, out=np.zeros(tc.shape, dtype=dtype), where=tp > 0)
+    # Severity per claim; ClaimCount falls back to the 0/1 claim flag when absent
+    claim_count = df['ClaimCount'].to_numpy() if 'ClaimCount' in df.columns else has_claim
+    df['AvgClaimSeverity'] = np.divide(tc, claim_count, out=np.full(tc.shape, np.nan, dtype=dtype),
+                                       where=claim_count > 0)
+    return df
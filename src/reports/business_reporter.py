@@ -1,52 +1,120 @@
 # business_reporter.py
+import logging
+import math
 import os
+import re
 from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+_WRITE_BUFFER_SIZE = 128 * 1024
+# Reports with fewer results than this are formatted without NumPy
+_SMALL_REPORT_ROWS = 4
+
+# Static parts of the report, joined once at import; only the title line and the
+# results rows change between reports
+_TITLE_TEMPLATE = "# Insurance Risk A/B Testing Report\n**Generated on:** {generated_on}\n\n"
+_HEADER = (
+    "## Executive Summary\n"
+    "This report summarizes hypothesis tests on key risk drivers "
+    "including provinces, zip codes, margins, and gender.\n\n"
+
+    "## Hypothesis Testing Results\n"
+    "| Hypothesis | Test Used | p-value | Decision | Interpretation |\n"
+    "|------------|-----------|---------|----------|----------------|\n"
+)
+_FOOTER = (
+    "\n## Business Recommendations\n"
+    "- **Provinces:** Adjust premiums regionally where risk differences are significant.\n"
+    "- **Zip Codes:** Simplify rating if no differences; micro-rate if margins differ.\n"
+    "- **Gender:** Avoid gender-based pricing (compliance/fairness).\n"
+    "- **Margins:** Investigate low-margin areas for fraud or mispricing.\n"
+)
+_ROW_TEMPLATE = "| {name} | {test} | {p_value} | {decision} | {interpretation} |\n"
+
+
+# Interpretation per risk driver, looked up from the first driver keyword in the test name
+_DRIVER_PATTERN = re.compile(r"(province|zip|gender)", re.IGNORECASE)
+_DRIVER_MESSAGES = {
+    "province": "Regional risk differences detected. Adjust premiums by province.",
+    "zip": "Zip-level differences found. Consider micro-rating or fraud checks.",
+    "gender": "Gender differences detected, but use with caution due to compliance.",
+}
+_NO_DIFFERENCE = "No significant differences detected."
+
+
+@lru_cache(maxsize=512)
+def _interpret(test_name, decision):
+    """Business reading of a test outcome; memoized because test names repeat across reports."""
+    if decision != "Reject H₀":
+        return _NO_DIFFERENCE
+    m = _DRIVER_PATTERN.search(test_name)
+    return _DRIVER_MESSAGES[m.group(1).lower()] if m else _NO_DIFFERENCE
+
 
 class BusinessReporter:
     """
     Generates a Markdown report summarizing A/B test results and business insights.
     """
 
+    # Output directories already created in this process
+    _ensured_dirs = set()
+
     def __init__(self, ab_results, output_dir="reports"):
         self.ab_results = ab_results
         self.output_dir = output_dir
-        os.makedirs(self.output_dir, exist_ok=True)
+        output_path = os.path.abspath(self.output_dir)
+        if output_path not in BusinessReporter._ensured_dirs:
+            os.makedirs(output_path, exist_ok=True)
+            BusinessReporter._ensured_dirs.add(output_path)
 
     def generate_markdown(self, filename="abtest_report.md"):
         report_path = os.path.join(self.output_dir, filename)
-        with open(report_path, "w", encoding="utf-8" ) as f:
-            f.write(f"# Insurance Risk A/B Testing Report\n")
-            f.write(f"**Generated on:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-
-            f.write("## Executive Summary\n")
-            f.write("This report summarizes hypothesis tests on key risk drivers "
-                    "including provinces, zip codes, margins, and gender.\n\n")
-
-            f.write("## Hypothesis Testing Results\n")
-            f.write("| Hypothesis | Test Used | p-value | Decision | Interpretation |\n")
-            f.write("|------------|-----------|---------|----------|----------------|\n")
-
-            for test_name, res in self.ab_results.items():
-                p = res.get("p_value", None)
-                decision = "Reject H₀" if p and p < 0.05 else "Fail to reject H₀"
-                interp = self.interpret(test_name, decision)
-                test_used = res.get("test", "N/A")
-                f.write(f"| {test_name} | {test_used} | {p:.4f} | {decision} | {interp} |\n")
-
-            f.write("\n## Business Recommendations\n")
-            f.write("- **Provinces:** Adjust premiums regionally where risk differences are significant.\n")
-            f.write("- **Zip Codes:** Simplify rating if no differences; micro-rate if margins differ.\n")
-            f.write("- **Gender:** Avoid gender-based pricing (compliance/fairness).\n")
-            f.write("- **Margins:** Investigate low-margin areas for fraud or mispricing.\n")
-
-        print(f"Markdown report generated at: {report_path}")
+        # For a handful of rows the NumPy setup costs more than a plain loop
+        if len(self.ab_results) < _SMALL_REPORT_ROWS:
+            rows = self._format_rows_small()
+        else:
+            rows = self._format_rows()
+
+        title = _TITLE_TEMPLATE.format(generated_on=datetime.now().isoformat(sep=' ', timespec='seconds'))
+
+        # A 128 KiB buffer lets large reports go out in a few write() calls
+        with open(report_path, "w", encoding="utf-8", buffering=_WRITE_BUFFER_SIZE) as f:
+            f.write(title)
+            f.write(_HEADER)
+            f.write("".join(rows))
+            f.write(_FOOTER)
+
+        log.info("Markdown report generated at: %s", report_path)
         return report_path
 
+    def _format_rows(self):
+        """Formats the results rows, deciding on all p-values in one vectorized pass."""
+        # All p-values in one array (missing -> NaN) so the decisions are one comparison
+        ps = np.fromiter((np.nan if res.get("p_value") is None else res["p_value"]
+                          for res in self.ab_results.values()),
+                         dtype=np.float64, count=len(self.ab_results))
+        decisions = np.where(ps < 0.05, "Reject H₀", "Fail to reject H₀").tolist()
+        # Missing p-values are shown as N/A rather than breaking the float format
+        p_strs = np.where(np.isnan(ps), "N/A", np.char.mod("%.4f", ps)).tolist()
+        return [_ROW_TEMPLATE.format(name=test_name, test=res.get("test", "N/A"), p_value=p,
+                                     decision=decision, interpretation=self.interpret(test_name, decision))
+                for (test_name, res), p, decision in zip(self.ab_results.items(), p_strs, decisions)]
+
+    def _format_rows_small(self):
+        """Formats the results rows one at a time; same output as _format_rows."""
+        rows = []
+        for test_name, res in self.ab_results.items():
+            p = res.get("p_value", None)
+            missing = p is None or math.isnan(p)
+            decision = "Reject H₀" if not missing and p < 0.05 else "Fail to reject H₀"
+            rows.append(_ROW_TEMPLATE.format(name=test_name, test=res.get("test", "N/A"),
+                                             p_value="N/A" if missing else f"{p:.4f}", decision=decision,
+                                             interpretation=self.interpret(test_name, decision)))
+        return rows
+
     def interpret(self, test_name, decision):
-        if "province" in test_name and decision == "Reject H₀":
-            return "Regional risk differences detected. Adjust premiums by province."
-        if "zip" in test_name and decision == "Reject H₀":
-            return "Zip-level differences found. Consider micro-rating or fraud checks."
-        if "gender" in test_name and decision == "Reject H₀":
-            return "Gender differences detected, but use with caution due to compliance."
-        return "No significant differences detected."
+        return _interpret(test_name, decision)
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The modules import each other as `src.<package>.<module>`, so the repo root must be importable
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+# analysis_pipeline imports its sibling modules by bare name, as when run from src/preprocessing
+sys.path.insert(0, os.path.join(ROOT, "src", "preprocessing"))
@@ -0,0 +1,130 @@
+"""Checks the hand-written test statistics in ABTester against their scipy references."""
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from src.preprocessing.ABTester import ABTester, chi2_from_counts
+
+
+@pytest.fixture
+def policies():
+    rng = np.random.default_rng(42)
+    n = 4000
+    df = pd.DataFrame({
+        'TotalClaims': (rng.random(n) < 0.15) * rng.exponential(100, n),
+        'TotalPremium': rng.exponential(50, n),
+        # 'Z' is a declared category that never occurs
+        'Province': pd.Categorical(rng.choice(list('ABCDE'), n), categories=list('ABCDEZ')),
+        'PostalCode': pd.Categorical(rng.choice([str(i) for i in range(25)], n)),
+        'Gender': pd.Categorical(rng.choice(['F', 'M', 'UNKNOWN'], n)),
+        'CoverCategory': pd.Categorical(rng.choice(list('xyz'), n)),
+        'Bodytype': rng.choice(list('pq'), n),
+        'LegalType': rng.choice(list('lm'), n),
+        'CustomValueEstimate': rng.normal(100, 10, n),
+        'SumInsured': rng.normal(1000, 100, n),
+    })
+    df.loc[rng.random(n) < 0.3, 'CustomValueEstimate'] = np.nan
+    return df
+
+
+def test_chi2_from_counts_matches_chi2_contingency():
+    counts = np.random.default_rng(0).integers(5, 50, size=(6, 3))
+    chi2, dof, p = chi2_from_counts(counts)
+    ref_chi2, ref_p, ref_dof, _ = stats.chi2_contingency(counts)
+    assert chi2 == pytest.approx(ref_chi2)
+    assert p == pytest.approx(ref_p)
+    assert dof == ref_dof
+
+
+def test_chi2_from_counts_2x2_has_no_yates_correction():
+    counts = np.array([[30, 10], [20, 25]])
+    chi2, _, p = chi2_from_counts(counts)
+    ref_chi2, ref_p, _, _ = stats.chi2_contingency(counts, correction=False)
+    assert chi2 == pytest.approx(ref_chi2)
+    assert p == pytest.approx(ref_p)
+    # scipy's default applies Yates' correction on 2x2 tables, which shrinks the statistic
+    assert chi2 > stats.chi2_contingency(counts)[0]
+
+
+def test_chi2_frequency_by_group_matches_crosstab(policies):
+    tester = ABTester(policies)
+    res = tester.chi2_frequency_by_group('Province')
+    ref = stats.chi2_contingency(pd.crosstab(tester.df['Province'], tester.df['HadClaim']))
+    assert res['chi2'] == pytest.approx(ref[0])
+    assert res['p_value'] == pytest.approx(ref[1])
+    # Unused categories do not show up as empty rows
+    assert list(res['table'].index) == list('ABCDE')
+
+
+def test_split_by_group_matches_groupby(policies):
+    tester = ABTester(policies)
+    groups = tester._split_by_group('Province', 'AvgClaimSeverity')
+    # Reference: pandas groupby with NaN severities dropped; unused category 'Z' is excluded
+    ref = [g.dropna().to_numpy() for _, g in tester.df.groupby('Province', observed=True)['AvgClaimSeverity']]
+    assert len(groups) == len(ref) == 5
+    for got, expected in zip(groups, ref):
+        np.testing.assert_allclose(np.sort(got), np.sort(expected))
+    assert tester.anova_severity_by_group('Province')['p_value'] == pytest.approx(stats.f_oneway(*ref).pvalue)
+
+
+def test_welch_ttest_matches_ttest_ind(policies):
+    tester = ABTester(policies)
+    res = tester.ttest_metric_between_groups('Gender', 'CustomValueEstimate', 'F', 'M')
+    col = tester.df['CustomValueEstimate']
+    ref = stats.ttest_ind(col[tester.df['Gender'] == 'F'], col[tester.df['Gender'] == 'M'],
+                          equal_var=False, nan_policy='omit')
+    assert res['t_stat'] == pytest.approx(ref.statistic)
+    assert res['p_value'] == pytest.approx(ref.pvalue)
+
+
+def test_pairwise_ttests_match_ttest_ind(policies):
+    tester = ABTester(policies)
+    table = tester.pairwise_ttests_by_group('Province', 'CustomValueEstimate')['table']
+    # 5 observed provinces -> 10 pairs; the unused category is skipped
+    assert len(table) == 10
+    col = tester.df['CustomValueEstimate']
+    for row in table.itertuples():
+        ref = stats.ttest_ind(col[tester.df['Province'] == row.A], col[tester.df['Province'] == row.B],
+                              equal_var=False, nan_policy='omit')
+        assert row.t_stat == pytest.approx(ref.statistic)
+        assert row.p_value == pytest.approx(ref.pvalue)
+
+
+def test_balance_check_numeric_matches_ttest_ind(policies):
+    tester = ABTester(policies)
+    report = tester.balance_check('Gender', 'F', 'M')['numeric']
+    a = tester.df[tester.df['Gender'] == 'F']
+    b = tester.df[tester.df['Gender'] == 'M']
+    assert set(report) == {'CustomValueEstimate', 'SumInsured', 'TotalPremium'}
+    for col, res in report.items():
+        ref = stats.ttest_ind(a[col], b[col], equal_var=False, nan_policy='omit')
+        assert res['mean_A'] == pytest.approx(a[col].mean())
+        assert res['t_stat'] == pytest.approx(ref.statistic)
+        assert res['p_value'] == pytest.approx(ref.pvalue)
+
+
+def test_balance_check_categorical_uses_a_vs_b_table(policies):
+    tester = ABTester(policies)
+    report = tester.balance_check('Gender', 'F', 'M')['categorical']
+    arms = tester.df[tester.df['Gender'].isin(['F', 'M'])]
+    for col in ['CoverCategory', 'Bodytype', 'LegalType']:
+        # Reference: 2 x k table of category counts in arm A vs arm B
+        ct = pd.crosstab(arms['Gender'].astype(str), arms[col])
+        ref_chi2, ref_p, _, _ = stats.chi2_contingency(ct, correction=False)
+        assert report[col]['chi2'] == pytest.approx(ref_chi2)
+        assert report[col]['p_value'] == pytest.approx(ref_p)
+
+
+def test_balance_check_skips_single_category_covariates(policies):
+    tester = ABTester(policies.assign(Bodytype='sedan'))
+    report = tester.balance_check('Gender', 'F', 'M')['categorical']
+    assert 'Bodytype' not in report
+    assert set(report) == {'CoverCategory', 'LegalType'}
+
+
+def test_chi2_without_degrees_of_freedom_is_not_significant(policies):
+    # No claims at all leaves a single HadClaim column, as chi2_contingency reports p = 1.0
+    res = ABTester(policies.assign(TotalClaims=0.0)).chi2_frequency_by_group('Province')
+    assert res['dof'] == 0
+    assert res['p_value'] == 1.0
@@ -0,0 +1,86 @@
+"""Checks how AnalysisPipeline reuses, refreshes and recovers its Feather checkpoints."""
+import os
+
+import pandas as pd
+import pytest
+
+import analysis_pipeline
+from analysis_pipeline import AnalysisPipeline
+
+RAW_ROWS = """PolicyID|TransactionMonth|TotalPremium|TotalClaims|Province|Gender
+1|2015-01-01 00:00:00|10.5|0|Gauteng|Male
+2|2015-02-01 00:00:00|20.0|100|Western Cape| female
+3|2015-03-01 00:00:00|5.25|0||
+"""
+
+
+@pytest.fixture
+def raw_file(tmp_path):
+    path = tmp_path / "policies.txt"
+    path.write_text(RAW_ROWS)
+    return path
+
+
+@pytest.fixture
+def count_loads(monkeypatch):
+    """Counts how often the raw file is parsed instead of served from a checkpoint."""
+    calls = []
+    load_data = analysis_pipeline.DataLoader.load_data
+
+    def counting_load_data(self):
+        calls.append(self.file_path)
+        return load_data(self)
+
+    monkeypatch.setattr(analysis_pipeline.DataLoader, "load_data", counting_load_data)
+    return calls
+
+
+def _clean_cache(pipeline):
+    return pipeline._cache_path(f".clean.v{analysis_pipeline.CLEAN_CACHE_VERSION}.feather")
+
+
+def test_default_cache_dir_is_interim_only_for_raw_folders(tmp_path):
+    assert AnalysisPipeline(tmp_path / "raw" / "a.txt").cache_dir == tmp_path / "interim"
+    assert AnalysisPipeline(tmp_path / "a.txt").cache_dir == tmp_path
+    assert AnalysisPipeline(tmp_path / "a.txt", cache_dir=tmp_path / "c").cache_dir == tmp_path / "c"
+
+
+def test_fresh_checkpoint_is_reused(raw_file, count_loads):
+    first = AnalysisPipeline(raw_file)._load_clean_data()
+    assert len(count_loads) == 1
+    assert _clean_cache(AnalysisPipeline(raw_file)).exists()
+    # No temporary files are left next to the checkpoints
+    assert not list(raw_file.parent.glob("*.tmp.feather"))
+
+    second = AnalysisPipeline(raw_file)._load_clean_data()
+    assert len(count_loads) == 1
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_stale_checkpoint_is_rebuilt(raw_file, count_loads):
+    pipeline = AnalysisPipeline(raw_file)
+    pipeline._load_clean_data()
+    clean_cache = _clean_cache(pipeline)
+    # Make both checkpoints older than the raw file
+    stamp = raw_file.stat().st_mtime - 10
+    for cache in (pipeline._cache_path(".feather"), clean_cache):
+        os.utime(cache, (stamp, stamp))
+
+    df = AnalysisPipeline(raw_file)._load_clean_data()
+    assert len(count_loads) == 2
+    assert len(df) == 3
+    assert clean_cache.stat().st_mtime >= raw_file.stat().st_mtime
+
+
+def test_corrupt_checkpoint_falls_back_to_full_load(raw_file, count_loads):
+    pipeline = AnalysisPipeline(raw_file)
+    expected = pipeline._load_clean_data()
+    # Truncate both checkpoints, keeping them newer than the raw file
+    for cache in (pipeline._cache_path(".feather"), _clean_cache(pipeline)):
+        cache.write_bytes(cache.read_bytes()[:20])
+
+    df = AnalysisPipeline(raw_file)._load_clean_data()
+    assert len(count_loads) == 2
+    pd.testing.assert_frame_equal(df, expected)
+    # The rebuilt checkpoint is readable again
+    pd.testing.assert_frame_equal(pd.read_feather(_clean_cache(pipeline)), expected)
@@ -0,0 +1,44 @@
+"""Checks the rows BusinessReporter writes into the Markdown report."""
+import math
+from pathlib import Path
+
+import pytest
+
+from src.reports.business_reporter import BusinessReporter
+
+RESULTS = {
+    "province_claim_freq": {"test": "chi2", "p_value": 0.0},
+    "zip_margin": {"test": "anova", "p_value": None},
+    "gender_severity": {"test": "t-test", "p_value": math.nan},
+    "province_margin": {"test": "anova", "p_value": 0.2},
+    "zip_claim_freq": {"p_value": 0.0123},
+}
+
+
+def test_vectorized_and_small_row_formatting_agree(tmp_path):
+    reporter = BusinessReporter(RESULTS, output_dir=tmp_path)
+    assert reporter._format_rows() == reporter._format_rows_small()
+
+
+def _report_rows(path):
+    """Maps each hypothesis name in the results table to its cells."""
+    rows = {}
+    for line in path.read_text(encoding="utf-8").splitlines():
+        cells = [cell.strip() for cell in line.strip("|").split("|")]
+        if line.startswith("| ") and cells[0] in RESULTS:
+            rows[cells[0]] = cells
+    return rows
+
+
+@pytest.mark.parametrize("names", [list(RESULTS), list(RESULTS)[:3]], ids=["vectorized", "small"])
+def test_generate_markdown_decisions_and_missing_p_values(tmp_path, names):
+    reporter = BusinessReporter({name: RESULTS[name] for name in names}, output_dir=tmp_path)
+    rows = _report_rows(Path(reporter.generate_markdown()))
+
+    assert list(rows) == names
+    # p = 0.0 is a rejection, not a missing value
+    assert rows["province_claim_freq"][2:4] == ["0.0000", "Reject H₀"]
+    assert rows["province_claim_freq"][4] == "Regional risk differences detected. Adjust premiums by province."
+    # Missing and NaN p-values are shown as N/A and never rejected
+    assert rows["zip_margin"][2:4] == ["N/A", "Fail to reject H₀"]
+    assert rows["gender_severity"][2:4] == ["N/A", "Fail to reject H₀"]
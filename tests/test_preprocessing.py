@@ -0,0 +1,51 @@
+"""Checks DataCleaner and DataEDA on small hand-made policy frames."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.preprocessing.data_cleaner import DataCleaner
+from src.preprocessing.data_explorer import DataEDA
+
+
+@pytest.fixture
+def policies():
+    return pd.DataFrame({
+        'PolicyID': [1, 2, 3, 4, 5, 6],
+        'TotalPremium': np.array([10.0, 20.0, 5.0, 8.0, 0.0, 12.0], dtype=np.float32),
+        'TotalClaims': np.array([0.0, 100.0, 0.0, 0.0, 0.0, 2500.0], dtype=np.float32),
+        'CustomValueEstimate': np.array([1e5, np.nan, 2e5, 3e5, 1e6, 5e4], dtype=np.float32),
+        'Province': pd.Categorical(['Gauteng', 'Gauteng', 'Limpopo', None, 'Limpopo', 'Gauteng']),
+        'Gender': pd.Categorical(['Male', ' female', None, 'Female ', 'male', 'Male']),
+        'MakeModel': pd.Categorical(['TOYOTA ', 'toyota', 'Ford', 'FORD', None, 'Ford']),
+    })
+
+
+def test_cleaning_and_eda_leave_the_input_frame_unchanged(policies):
+    before = policies.copy(deep=True)
+
+    cleaned = DataCleaner(policies).get_cleaned_data()
+    explorer = DataEDA(policies)
+
+    pd.testing.assert_frame_equal(policies, before)
+    # The work happened on the copies
+    assert 'HasClaim' in explorer.get_clean_data().columns
+    assert 'HasClaim' not in policies.columns
+    assert (cleaned['Gender'] == 'UNKNOWN').any()
+
+
+def test_missing_categorical_labels_are_filled_with_unknown(policies):
+    cleaned = DataCleaner(policies).handle_missing_values()
+
+    assert isinstance(cleaned['Province'].dtype, pd.CategoricalDtype)
+    assert cleaned['Province'].tolist() == ['Gauteng', 'Gauteng', 'Limpopo', 'UNKNOWN', 'Limpopo', 'Gauteng']
+    assert cleaned['Gender'].isna().sum() == 0
+    assert cleaned['Gender'].iloc[2] == 'UNKNOWN'
+
+
+def test_risk_by_group_counts_zero_claims_for_claim_free_groups(policies):
+    risk = DataEDA(policies).calculate_risk_by_group('Province')
+
+    assert risk.loc['Limpopo', 'ClaimCount'] == 0
+    assert risk.loc['Limpopo', 'ClaimFrequency'] == 0
+    assert risk.loc['Gauteng', 'ClaimCount'] == 2
+    assert risk.loc['Gauteng', 'PolicyCount'] == 3